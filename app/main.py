@@ -1,36 +1,181 @@
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Dict, Optional, List
-from datetime import timedelta
+from contextlib import asynccontextmanager
+import asyncio
+from dataclasses import dataclass, field
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import joblib
 
 MODEL_PATH = Path(__file__).parents[1] / "data" / "model.pkl"
-STOCK_DATA_PATH = Path(__file__).parents[1] / "data" / "stock_features.csv"
+STOCK_DATA_PATH = Path(__file__).parents[1] / "data" / "stock_features.parquet"
 FEATURE_COLUMNS = [
     "daily_return", "ma_5", "volatility_10", 
     "volume_spike", "day_of_week", "lag_close_1", "hl_range"
 ]
 
-# Load the trained model
-try:
-    # Try to find any .pkl file with stock_direction_predictor in the name
-    if not MODEL_PATH.exists():
-        raise FileNotFoundError("No model file found")
-    
-    MODEL = joblib.load(MODEL_PATH.as_posix())
-    print(f"Loaded model: {MODEL_PATH}")
-except Exception as e:
-    print(f"Error loading model: {e}")
-    MODEL = None
+# Trained model, loaded on startup
+MODEL = None
+
+@dataclass(frozen=True, eq=False)
+class StockData:
+    """Per-symbol caches built from one version (mtime) of the stock data file"""
+    mtime: float
+    # Latest feature row per symbol
+    latest_by_symbol: Dict[str, np.ndarray]
+    # Next trading day after the latest data point per symbol
+    predicted_date_by_symbol: Dict[str, str]
+    # Prediction responses made from this data, filled in as symbols are requested
+    predictions: Dict[str, Dict[str, object]] = field(default_factory=dict)
+
+# Current stock data, swapped as a whole whenever the data file changes
+_STOCK_DATA: Optional[StockData] = None
+# Modification time of a data file that failed to load, so it isn't retried until it changes
+_STOCK_DATA_FAILED_MTIME: Optional[float] = None
+# Lets only one request at a time reload the stock data
+_STOCK_DATA_RELOAD_LOCK = asyncio.Lock()
+
+
+def load_model() -> None:
+    """Load the trained model and warm it up with a dummy prediction"""
+    global MODEL
+
+    try:
+        # Try to find any .pkl file with stock_direction_predictor in the name
+        if not MODEL_PATH.exists():
+            raise FileNotFoundError("No model file found")
+
+        # Memory-map the estimator's numpy arrays instead of copying them into each worker
+        model = joblib.load(MODEL_PATH.as_posix(), mmap_mode="r")
+        # Run one prediction up front so the first real request doesn't pay the warm-up cost
+        model.predict_proba(np.zeros((1, len(FEATURE_COLUMNS)), dtype=np.float32))
+        MODEL = model
+        print(f"Loaded model: {MODEL_PATH}")
+    except Exception as e:
+        print(f"Error loading model: {e}")
+        MODEL = None
+    # Predictions made by any previous model are stale now
+    if _STOCK_DATA is not None:
+        _STOCK_DATA.predictions.clear()
+
+def load_stock_data() -> bool:
+    """Load the stock features into the per-symbol caches if they changed on disk.
+
+    Returns:
+        True if the caches were rebuilt, False if the file is unchanged
+    """
+    global _STOCK_DATA
+
+    mtime = STOCK_DATA_PATH.stat().st_mtime
+    if _STOCK_DATA is not None and mtime == _STOCK_DATA.mtime:
+        return False
+
+    # Only the columns needed for prediction are read, memory-mapped rather than buffered
+    raw_data = pd.read_parquet(
+        STOCK_DATA_PATH,
+        engine="pyarrow",
+        columns=["symbol", "date", *FEATURE_COLUMNS],
+        memory_map=True
+    )
+    # Latest row per symbol, picked in one pass over the date-sorted frame
+    latest_data = (
+        raw_data.sort_values("date", kind="stable")
+        .groupby("symbol", sort=False)
+        .tail(1)
+        .set_index("symbol")
+    )
+    features = latest_data[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+    latest_by_symbol = {
+        symbol: features[i:i + 1] for i, symbol in enumerate(latest_data.index)
+    }
+    # Next trading day after the latest data point, skipping weekends
+    predicted_date = latest_data["date"] + pd.offsets.BDay(1)
+    predicted_date_by_symbol = predicted_date.dt.strftime("%Y-%m-%d").to_dict()
+
+    # Swap in the new caches only once they are fully built
+    _STOCK_DATA = StockData(mtime, latest_by_symbol, predicted_date_by_symbol)
+    print(f"Loaded stock data: {STOCK_DATA_PATH} ({len(latest_by_symbol)} symbols)")
+    return True
+
+def _predict_symbol(symbol: str, stock_data: StockData) -> Dict[str, object]:
+    """
+    Predict the next trading day's price direction for a symbol.
+
+    Only reads from the given StockData, never from the module globals, so a
+    reload while this runs in the threadpool can't mix versions.
+    """
+    # Features of the latest available data point for prediction
+    features_array = stock_data.latest_by_symbol[symbol]
+    if not np.isfinite(features_array).all():
+        raise ValueError(f"Latest features for '{symbol}' contain missing or infinite values")
+
+    # Make prediction, deriving the class from the probabilities rather than
+    # running the model a second time through MODEL.predict
+    prediction_proba = MODEL.predict_proba(features_array)[0]
+    class_index = int(prediction_proba.argmax())
+    prediction_value = MODEL.classes_[class_index]
+
+    # Get confidence score (probability of the predicted class)
+    confidence = prediction_proba[class_index]
+
+    return {
+        "symbol": symbol,
+        "prediction": "UP" if prediction_value == 1 else "DOWN",
+        "confidence": float(confidence),
+        "predicted_date": stock_data.predicted_date_by_symbol[symbol],
+    }
+
+def _changed_stock_data_mtime() -> Optional[float]:
+    """Return the stock data file's mtime if it changed since it was last loaded or failed to load"""
+    try:
+        mtime = STOCK_DATA_PATH.stat().st_mtime
+    except OSError:
+        return None
+    if _STOCK_DATA is not None and mtime == _STOCK_DATA.mtime:
+        return None
+    if mtime == _STOCK_DATA_FAILED_MTIME:
+        return None
+    return mtime
+
+async def refresh_stock_data() -> None:
+    """
+    Reload the stock data if the file changed since this worker last loaded it.
+
+    Every worker process keeps its own caches, so each one checks the file's
+    mtime on every request instead of relying on /reload reaching it. The check
+    runs on the event loop; the reload itself runs in the threadpool, one at a time.
+    """
+    global _STOCK_DATA_FAILED_MTIME
+
+    if _changed_stock_data_mtime() is None:
+        return
+    async with _STOCK_DATA_RELOAD_LOCK:
+        # Another request may have reloaded the data while this one waited
+        mtime = _changed_stock_data_mtime()
+        if mtime is None:
+            return
+        try:
+            await run_in_threadpool(load_stock_data)
+        except Exception as e:
+            print(f"Error loading stock data: {e}")
+            _STOCK_DATA_FAILED_MTIME = mtime
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the model and stock data before the API starts serving requests"""
+    load_model()
+    await refresh_stock_data()
+    yield
 
 
 app = FastAPI(
     title="Stock Price Direction Predictor API",
     description="API for predicting whether a stock price will go up or down on the next trading day",
-    version="0.0.0"
+    version="0.0.0",
+    lifespan=lifespan
 )
 
 class PredictionResponse(BaseModel):
@@ -60,21 +205,35 @@ async def health_check():
         return {"status": "degraded", "message": "Model not loaded properly"}
     try:
         # Check if we can access the stock data
-        if STOCK_DATA_PATH.exists():
-            return {"status": "healthy", "message": "API is fully operational"}
-        else:
+        if not STOCK_DATA_PATH.exists():
             return {"status": "degraded", "message": "Stock data file not found"}
+        elif _STOCK_DATA is None:
+            return {"status": "degraded", "message": "Stock data not loaded properly"}
+        else:
+            return {"status": "healthy", "message": "API is fully operational"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 @app.get("/symbols", response_model=List[str])
 async def get_available_symbols():
     """Get list of all available stock symbols"""
+    await refresh_stock_data()
+    if _STOCK_DATA is None:
+        raise HTTPException(status_code=500, detail="Error retrieving symbols: stock data not loaded")
+    return sorted(_STOCK_DATA.latest_by_symbol)
+
+@app.post("/reload", response_model=Dict[str, str])
+async def reload_stock_data():
+    """Reload the stock data if the file has changed since it was last loaded"""
     try:
-        raw_data = pd.read_csv(STOCK_DATA_PATH)
-        return sorted(raw_data["symbol"].unique().tolist())
+        async with _STOCK_DATA_RELOAD_LOCK:
+            reloaded = await run_in_threadpool(load_stock_data)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving symbols: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error reloading stock data: {str(e)}")
+    return {
+        "status": "reloaded" if reloaded else "unchanged",
+        "symbols": str(len(_STOCK_DATA.latest_by_symbol))
+    }
     
 @app.get("/predict/{symbol}", response_model=PredictionResponse, responses={404: {"model": ErrorResponse}, 400: {"model": ErrorResponse}})
 async def predict(
@@ -84,40 +243,23 @@ async def predict(
     # Check if model is loaded
     if MODEL is None:
         raise HTTPException(status_code=500, detail="Model not loaded. Please check server logs.")
+    # Check if stock data is loaded and up to date
+    await refresh_stock_data()
+    # Use one version of the stock data for the whole request
+    stock_data = _STOCK_DATA
+    if stock_data is None:
+        raise HTTPException(status_code=500, detail="Stock data not loaded. Please check server logs.")
     try:
-        raw_data = pd.read_csv(STOCK_DATA_PATH)
-
-        if symbol not in raw_data["symbol"].unique():
+        if symbol not in stock_data.latest_by_symbol:
             raise HTTPException(status_code=404, detail=f"Symbol '{symbol}' not found in the dataset")
 
-        symbol_df = raw_data[raw_data["symbol"] == symbol]
-    
-        # Get the latest available data point for prediction
-        latest_data = symbol_df.iloc[-1]
-        
-        # Extract features for prediction
-        features = latest_data[FEATURE_COLUMNS].to_dict()
-        features_array = np.array([list(features.values())])
-        
-        # Make prediction
-        prediction_value = MODEL.predict(features_array)[0]
-        prediction_proba = MODEL.predict_proba(features_array)[0]
-        
-        # Get confidence score (probability of the predicted class)
-        confidence = prediction_proba[prediction_value]
-        
-        # Determine next trading day
-        prediction_date = pd.to_datetime(latest_data["date"]) + timedelta(days=1)
-        # If the next day is a weekend, adjust to Monday
-        if prediction_date.dayofweek >= 5:  # 5=Saturday, 6=Sunday
-            prediction_date = prediction_date + timedelta(days=7 - prediction_date.dayofweek)
-            
-        return {
-            "symbol": symbol,
-            "prediction": "UP" if prediction_value == 1 else "DOWN",
-            "confidence": float(confidence),
-            "predicted_date": prediction_date.strftime("%Y-%m-%d"),
-        }
+        # Predictions are cached per data version; only a cache miss runs inference,
+        # in the threadpool so the event loop keeps serving other requests
+        prediction = stock_data.predictions.get(symbol)
+        if prediction is None:
+            prediction = await run_in_threadpool(_predict_symbol, symbol, stock_data)
+            stock_data.predictions[symbol] = prediction
+        return prediction
     except Exception as e:
         if isinstance(e, HTTPException):
             raise e
@@ -1,5 +1,7 @@
 #%%
 from stocks_api import FinancialModelingPrepClient
+import asyncio
+import httpx
 import os
 import pandas as pd
 from pathlib import Path
@@ -17,20 +19,34 @@ SAMPLE_TICKERS = [
 ]
 #%%
 start_date = "2021-01-01" # max last five years
-data = list()
-for ticker in SAMPLE_TICKERS:
-    try:
-        res = api_client.get_historical_price(ticker, from_date=start_date)
-        df = pd.DataFrame(res)
-        data.append(df)
-    except Exception as e:
+MAX_CONCURRENT_REQUESTS = 8
+
+async def fetch_historical_prices(tickers, from_date):
+    # Fetch every ticker concurrently over a shared connection pool
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    limits = httpx.Limits(max_connections=MAX_CONCURRENT_REQUESTS)
+    async with httpx.AsyncClient(http2=True, limits=limits) as client:
+        async def fetch(ticker):
+            async with semaphore:
+                return await api_client.get_historical_price_async(client, ticker, from_date=from_date)
+        return await asyncio.gather(*[fetch(ticker) for ticker in tickers], return_exceptions=True)
+
+responses = asyncio.run(fetch_historical_prices(SAMPLE_TICKERS, start_date))
+records = list()
+for ticker, res in zip(SAMPLE_TICKERS, responses):
+    # Failed requests come back as exceptions, and API errors as JSON objects rather than lists
+    if not isinstance(res, list):
         # GOOG, AVGO, LLY, and MA are premium tickers
         print("Couldn't get {0}".format(ticker,))
-        print(e)
+        print(res)
+        continue
+    records.extend(res)
 
-df = pd.concat(data)
+# Build a single frame from all records rather than concatenating one per ticker
+df = pd.DataFrame.from_records(records)
 df.columns = ["symbol","date","open","high","low","close","volume"]
+df["date"] = pd.to_datetime(df["date"])
 # %%
-dest_path = Path(__file__).parents[1] / "data" / "raw_stock_prices.csv"
-df.to_csv(dest_path.as_posix(), index=False)
+dest_path = Path(__file__).parents[1] / "data" / "raw_stock_prices.parquet"
+df.to_parquet(dest_path.as_posix(), engine="pyarrow", compression="zstd", index=False)
 # %%
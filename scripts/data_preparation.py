@@ -1,35 +1,120 @@
 #%%
+import numpy as np
 import pandas as pd
+from numba import njit, prange
 from pathlib import Path
 # %%
 DATA_DIR = Path(__file__).parents[1] / "data"
-SRC_PATH = DATA_DIR / "raw_stock_prices.csv"
-DEST_PATH = DATA_DIR / "stock_features.csv"
-df = pd.read_csv(SRC_PATH.as_posix())
-df["date"] = pd.to_datetime(df["date"])
+SRC_PATH = DATA_DIR / "raw_stock_prices.parquet"
+DEST_PATH = DATA_DIR / "stock_features.parquet"
+df = pd.read_parquet(
+    SRC_PATH.as_posix(),
+    engine="pyarrow",
+    columns=["symbol", "date", "open", "high", "low", "close", "volume"]
+)
 # %%
-def compute_features(symbol_df: pd.DataFrame):
-    df = symbol_df.sort_values(by="date").copy()
-    # Daily Return
-    df["daily_return"] = (df["close"] - df["open"]) / df["open"]
-    # 5-day Moving Avergage (close)
-    df["ma_5"] = df["close"].rolling(5).mean()
-    # 10-day Rolling Volatility (standard deviation of close)
-    df["volatility_10"] = df["close"].rolling(10).std()
-    # Volume Spike
-    df["volume_spike"] = df["volume"] / df["volume"].rolling(5).mean()
-    # Day of Week
-    df["day_of_week"] = df["date"].dt.day_of_week
-    # Lag-1 Close, previous day's closing price
-    df["lag_close_1"] = df["close"].shift(1)
-    # High-Low Range
-    df["hl_range"] = (df["high"] - df["low"]) / df["low"]
-    # Next Day's Closing Price
-    df["next_day_close"] = df["close"].shift(-1)
+# error_model="numpy" turns a division by zero (e.g. five days of zero volume)
+# into inf/NaN as pandas would, instead of raising ZeroDivisionError
+@njit(parallel=True, cache=True, error_model="numpy")
+def _compute(offsets, open_, high, low, close, volume,
+             out_daily_return, out_ma_5, out_volatility_10, out_volume_spike,
+             out_lag_close_1, out_hl_range, out_next_day_close, out_price_up):
+    # Each symbol owns the rows offsets[s]:offsets[s + 1], so symbols run in parallel.
+    # Rows without enough history keep the NaN the outputs were filled with.
+    for s in prange(len(offsets) - 1):
+        start, end = offsets[s], offsets[s + 1]
+        # Running sums over the trailing 5 and 10 rows. Missing (non-finite) values
+        # are left out of the sums and counted instead, so a window is only
+        # reported while it holds none, like pandas' rolling() with min_periods
+        close_sum_5 = 0.0
+        volume_sum_5 = 0.0
+        close_sum_10 = 0.0
+        close_sq_sum_10 = 0.0
+        close_missing_5 = 0
+        volume_missing_5 = 0
+        close_missing_10 = 0
+        for i in range(start, end):
+            n = i - start
+            if np.isfinite(close[i]):
+                close_sum_5 += close[i]
+                close_sum_10 += close[i]
+                close_sq_sum_10 += close[i] * close[i]
+            else:
+                close_missing_5 += 1
+                close_missing_10 += 1
+            if np.isfinite(volume[i]):
+                volume_sum_5 += volume[i]
+            else:
+                volume_missing_5 += 1
+            if n >= 5:
+                if np.isfinite(close[i - 5]):
+                    close_sum_5 -= close[i - 5]
+                else:
+                    close_missing_5 -= 1
+                if np.isfinite(volume[i - 5]):
+                    volume_sum_5 -= volume[i - 5]
+                else:
+                    volume_missing_5 -= 1
+            if n >= 10:
+                if np.isfinite(close[i - 10]):
+                    close_sum_10 -= close[i - 10]
+                    close_sq_sum_10 -= close[i - 10] * close[i - 10]
+                else:
+                    close_missing_10 -= 1
+
+            # Daily Return and High-Low Range
+            out_daily_return[i] = (close[i] - open_[i]) / open_[i]
+            out_hl_range[i] = (high[i] - low[i]) / low[i]
+            # 5-day Moving Avergage (close) and Volume Spike
+            if n >= 4 and close_missing_5 == 0:
+                out_ma_5[i] = close_sum_5 / 5
+            if n >= 4 and volume_missing_5 == 0:
+                out_volume_spike[i] = volume[i] / (volume_sum_5 / 5)
+            # 10-day Rolling Volatility (standard deviation of close)
+            if n >= 9 and close_missing_10 == 0:
+                var = (close_sq_sum_10 - close_sum_10 * close_sum_10 / 10) / 9
+                out_volatility_10[i] = np.sqrt(max(var, 0.0))
+            # Lag-1 Close and Next Day's Closing Price
+            if n >= 1:
+                out_lag_close_1[i] = close[i - 1]
+            if i < end - 1:
+                out_next_day_close[i] = close[i + 1]
+                out_price_up[i] = 1 if close[i + 1] > close[i] else 0
+
+def compute_features(df: pd.DataFrame):
+    # Sort once so every symbol's rows are contiguous and in date order
+    df = df.sort_values(by=["symbol", "date"])
+    _, starts = np.unique(df["symbol"].to_numpy(), return_index=True)
+    offsets = np.append(starts, len(df)).astype(np.int64)
+    n_rows = len(df)
+
+    features = {column: df[column].to_numpy() for column in df.columns}
+    for column in ["daily_return", "ma_5", "volatility_10", "volume_spike",
+                   "lag_close_1", "hl_range", "next_day_close"]:
+        features[column] = np.full(n_rows, np.nan)
     # Creating a binary target variable `price_up` (1 if tomorrow's close > today's close, 0 otherwise)
-    df["price_up"] = (df["next_day_close"] > df["close"]).astype(int)
-    return df.dropna()
+    features["price_up"] = np.zeros(n_rows, dtype=np.int64)
+    _compute(
+        offsets,
+        df["open"].to_numpy(dtype=np.float64),
+        df["high"].to_numpy(dtype=np.float64),
+        df["low"].to_numpy(dtype=np.float64),
+        df["close"].to_numpy(dtype=np.float64),
+        df["volume"].to_numpy(dtype=np.float64),
+        features["daily_return"], features["ma_5"], features["volatility_10"],
+        features["volume_spike"], features["lag_close_1"], features["hl_range"],
+        features["next_day_close"], features["price_up"],
+    )
+    # Day of Week
+    features["day_of_week"] = df["date"].dt.day_of_week.to_numpy()
+
+    column_order = list(df.columns) + [
+        "daily_return", "ma_5", "volatility_10", "volume_spike", "day_of_week",
+        "lag_close_1", "hl_range", "next_day_close", "price_up"
+    ]
+    return pd.DataFrame(features, columns=column_order).dropna()
+
 # %%
-features_df = df.groupby("symbol").apply(compute_features).reset_index(drop=True)
+features_df = compute_features(df)
 # %%
-features_df.to_csv(DEST_PATH.as_posix(), index=False)
+features_df.to_parquet(DEST_PATH.as_posix(), engine="pyarrow", compression="zstd", index=False)
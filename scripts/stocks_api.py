@@ -1,7 +1,36 @@
 import requests
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Any
+from urllib3.util.retry import Retry
 import time
 
+# Retry policy shared by the sync session and the async client
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+
+def create_session() -> requests.Session:
+    """
+    Create a requests session that keeps connections alive between calls.
+    
+    Requests to HTTPS hosts are pooled and retried with exponential backoff
+    on rate limiting (429) and transient server errors.
+    
+    Returns:
+        A configured requests session
+    """
+    # raise_on_status=False hands the last failed response back to the client's own error handling
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        raise_on_status=False
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+    return session
+
 
 class AlphaVantageClient:
     """
@@ -23,6 +52,7 @@ class AlphaVantageClient:
         self.api_key = api_key
         self.rate_limit = rate_limit_per_min
         self.last_request_time = 0
+        self.session = create_session()
     
     def _enforce_rate_limit(self) -> None:
         """Enforce the rate limit by waiting if necessary."""
@@ -53,7 +83,7 @@ class AlphaVantageClient:
         # Add API key to parameters
         params['apikey'] = self.api_key
         
-        response = requests.get(self.BASE_URL, params=params)
+        response = self.session.get(self.BASE_URL, params=params)
         
         # Check if the request was successful
         if response.status_code != 200:
@@ -121,6 +151,9 @@ class AlphaVantageClient:
         data = self._make_request(params)
         return data.get('bestMatches', [])
 
+import asyncio
+import httpx
+import orjson
 import requests
 from typing import Dict, Any, Optional, List
 
@@ -142,6 +175,33 @@ class FinancialModelingPrepClient:
             api_key: Your Financial Modeling Prep API key
         """
         self.api_key = api_key
+        self.session = create_session()
+    
+    def _parse_response(self, response) -> Dict[str, Any]:
+        """
+        Validate and decode a response from the Financial Modeling Prep API.
+        
+        Args:
+            response: A requests or httpx response
+            
+        Returns:
+            JSON response data as a dictionary
+            
+        Raises:
+            Exception: If the API request failed
+        """
+        # Check if the request was successful
+        if response.status_code != 200:
+            raise Exception(f"API request failed with status code {response.status_code}: {response.text}")
+        
+        # orjson decodes the large historical price payloads faster than the stdlib json
+        data = orjson.loads(response.content)
+        
+        # Check for empty response
+        if not data and isinstance(data, list):
+            print(f"Warning: Empty response received. Check symbol and date range.")
+        
+        return data
     
     def _make_request(self, endpoint: str, params: Dict[str, str]) -> Dict[str, Any]:
         """
@@ -161,19 +221,54 @@ class FinancialModelingPrepClient:
         params['apikey'] = self.api_key
         
         url = f"{self.BASE_URL}{endpoint}"
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         
-        # Check if the request was successful
-        if response.status_code != 200:
-            raise Exception(f"API request failed with status code {response.status_code}: {response.text}")
+        return self._parse_response(response)
+    
+    async def _make_request_async(self,
+                                  client: httpx.AsyncClient,
+                                  endpoint: str,
+                                  params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Make a request to the Financial Modeling Prep API without blocking the event loop.
         
-        data = response.json()
+        Connection and read errors, rate limiting (429) and transient server errors
+        are retried with exponential backoff, matching the retry policy of the sync session.
         
-        # Check for empty response
-        if not data and isinstance(data, list):
-            print(f"Warning: Empty response received. Check symbol and date range.")
+        Args:
+            client: The httpx async client to send the request with
+            endpoint: API endpoint path
+            params: Dictionary of query parameters
+            
+        Returns:
+            JSON response data as a dictionary
+            
+        Raises:
+            Exception: If the API request fails
+        """
+        # Add API key to parameters
+        params['apikey'] = self.api_key
         
-        return data
+        url = f"{self.BASE_URL}{endpoint}"
+        for attempt in range(MAX_RETRIES + 1):
+            # Back off exponentially like the sync session's Retry
+            delay = BACKOFF_FACTOR * 2 ** attempt
+            try:
+                response = await client.get(url, params=params)
+            except httpx.TransportError:
+                if attempt == MAX_RETRIES:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+                break
+            # Honour Retry-After if given
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            await asyncio.sleep(delay)
+        
+        return self._parse_response(response)
     
     def get_historical_price(self, 
                            symbol: str, 
@@ -190,6 +285,33 @@ class FinancialModelingPrepClient:
         Returns:
             List of dictionaries containing historical price data
         """
+        return self._make_request(*self._historical_price_request(symbol, from_date, to_date))
+    
+    async def get_historical_price_async(self,
+                                         client: httpx.AsyncClient,
+                                         symbol: str,
+                                         from_date: Optional[str] = None,
+                                         to_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get non-split-adjusted historical stock prices for a given symbol, asynchronously.
+        
+        Args:
+            client: The httpx async client to send the request with, shared across calls
+                so that connections are pooled
+            symbol: The stock symbol (e.g., 'AAPL', 'MSFT')
+            from_date: Start date in 'YYYY-MM-DD' format (optional)
+            to_date: End date in 'YYYY-MM-DD' format (optional)
+            
+        Returns:
+            List of dictionaries containing historical price data
+        """
+        return await self._make_request_async(client, *self._historical_price_request(symbol, from_date, to_date))
+    
+    def _historical_price_request(self,
+                                  symbol: str,
+                                  from_date: Optional[str] = None,
+                                  to_date: Optional[str] = None):
+        """Build the endpoint and parameters for a historical price request."""
         endpoint = "/historical-price-eod/non-split-adjusted"
             
         # Build parameters
@@ -203,4 +325,4 @@ class FinancialModelingPrepClient:
         if to_date:
             params['to'] = to_date
         
-        return self._make_request(endpoint, params)
\ No newline at end of file
+        return endpoint, params
\ No newline at end of file